@@ -14,19 +14,80 @@ Usage:
 """
 
 import argparse
+import calendar
+from collections import namedtuple
 from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
-import yaml
+from functools import lru_cache
+import heapq
+from itertools import chain, cycle, groupby
+from operator import attrgetter
 import os
 import re
 import json
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.patches import Rectangle
-import matplotlib.dates as mdates
+
+
+# Relative date argument: +N with optional unit (d, w, m, y)
+_REL_RE = re.compile(r'^\+(\d+)([dwmy])?$')
+
+# Single-digit numbers in ICS filenames (zero-padded so files sort naturally)
+_DIGIT_RE = re.compile(r'\b(\d)\b')
+
+# Weekday index (Monday=0) by lowercase day name
+_DAY_MAP = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2,
+    'thursday': 3, 'friday': 4, 'saturday': 5, 'sunday': 6
+}
+
+
+@lru_cache(maxsize=4096)
+def _weekday_name(ordinal):
+    """Full weekday name (e.g. 'Monday') for a proleptic Gregorian ordinal."""
+    return datetime.fromordinal(ordinal).strftime('%A')
+
+
+@lru_cache(maxsize=4096)
+def _iso(ordinal):
+    """YYYY-MM-DD string for a proleptic Gregorian ordinal."""
+    return datetime.fromordinal(ordinal).strftime('%Y-%m-%d')
+
+
+class Shift(namedtuple('Shift', 'date layer_name start_h start_m end_h end_m person layer_idx')):
+    """A single on-call shift, with its time window parsed once into integers."""
+    __slots__ = ()
+    
+    @property
+    def start_time(self):
+        return f"{self.start_h:02d}:{self.start_m:02d}"
+    
+    @property
+    def end_time(self):
+        return f"{self.end_h:02d}:{self.end_m:02d}"
+    
+    @property
+    def time_window(self):
+        return f"{self.start_time} - {self.end_time}"
+
+
+@lru_cache(maxsize=1024)
+def _parse_time(time_str):
+    """
+    Parse an 'HH:MM' string into an (hour, minute) tuple.
+    
+    Raises:
+        ValueError: If the value is not a valid HH:MM time
+    """
+    try:
+        hours, minutes = map(int, time_str.split(':'))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid time '{time_str}'. Use HH:MM (e.g., 08:00)")
+    return hours, minutes
+
+
+@lru_cache(maxsize=64)
+def _hex_to_rgb(hex_color):
+    """Convert an 'RRGGBB' (or '#RRGGBB') color to a matplotlib RGB tuple in 0..1."""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) / 255.0 for i in (0, 2, 4))
 
 
 def parse_override_argument(override_str):
@@ -71,7 +132,7 @@ def find_shift_for_override(layer_shifts, override_dt):
     Find the shift that should be overridden based on datetime.
     
     Args:
-        layer_shifts: List of (date, layer_name, time_window, person, layer_idx)
+        layer_shifts: List of Shift tuples
         override_dt: Datetime to find the shift for (or None for NOW)
     
     Returns:
@@ -82,25 +143,10 @@ def find_shift_for_override(layer_shifts, override_dt):
         override_dt = datetime.now()
     
     # Check each shift
-    for idx, (shift_date, layer_name, time_window, person, layer_idx) in enumerate(layer_shifts):
-        # Parse time window
-        time_parts = time_window.split(' - ')
-        if len(time_parts) != 2:
-            continue
-        
-        start_time_str = time_parts[0].strip()
-        end_time_str = time_parts[1].strip()
-        
-        # Parse times
-        try:
-            start_hour, start_min = map(int, start_time_str.split(':'))
-            end_hour, end_min = map(int, end_time_str.split(':'))
-        except:
-            continue
-        
+    for idx, shift in enumerate(layer_shifts):
         # Create datetime objects for this shift
-        shift_start = shift_date.replace(hour=start_hour, minute=start_min, second=0, microsecond=0)
-        shift_end = shift_date.replace(hour=end_hour, minute=end_min, second=0, microsecond=0)
+        shift_start = shift.date.replace(hour=shift.start_h, minute=shift.start_m, second=0, microsecond=0)
+        shift_end = shift.date.replace(hour=shift.end_h, minute=shift.end_m, second=0, microsecond=0)
         
         # Check if override_dt falls within this shift
         if shift_start <= override_dt < shift_end:
@@ -114,7 +160,7 @@ def apply_overrides(layer_shifts, overrides):
     Apply overrides to the layer_shifts list.
     
     Args:
-        layer_shifts: List of (date, layer_name, time_window, person, layer_idx)
+        layer_shifts: List of Shift tuples
         overrides: List of (datetime, username) tuples
     
     Returns:
@@ -128,16 +174,18 @@ def apply_overrides(layer_shifts, overrides):
         if shift_idx is not None:
             # Get original shift details
             original_shift = layer_shifts[shift_idx]
-            shift_date, layer_name, time_window, original_person, layer_idx = original_shift
+            shift_date = original_shift.date
+            time_window = original_shift.time_window
+            original_person = original_shift.person
             
             # Apply override
-            layer_shifts[shift_idx] = (shift_date, layer_name, time_window, username, layer_idx)
+            layer_shifts[shift_idx] = original_shift._replace(person=username)
             
             # Record what was changed
             override_info = {
                 'date': shift_date.strftime('%Y-%m-%d'),
                 'time_window': time_window,
-                'layer': layer_name,
+                'layer': original_shift.layer_name,
                 'original_person': original_person,
                 'override_person': username,
                 'override_datetime': override_dt.strftime('%Y-%m-%d %H:%M') if override_dt else 'NOW'
@@ -184,6 +232,41 @@ def save_execution_metadata(output_dir, config_file, start_date, end_date, overr
     print(f"  ℹ Execution metadata saved: {metadata_file}")
 
 
+def add_months(dt, months):
+    """
+    Add a number of calendar months to a datetime.
+    
+    The day is clamped to the last day of the target month
+    (e.g. Jan 31 + 1 month -> Feb 28).
+    
+    Args:
+        dt: Base datetime
+        months: Number of months to add
+    
+    Returns:
+        datetime object
+    """
+    month_index = dt.month - 1 + months
+    year = dt.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(dt.day, calendar.monthrange(year, month)[1])
+    return dt.replace(year=year, month=month, day=day)
+
+
+def add_years(dt, years):
+    """
+    Add a number of years to a datetime (Feb 29 is clamped to Feb 28).
+    
+    Args:
+        dt: Base datetime
+        years: Number of years to add
+    
+    Returns:
+        datetime object
+    """
+    return add_months(dt, years * 12)
+
+
 def parse_date_argument(date_str, reference_date=None):
     """
     Parse a date argument that can be either absolute (YYYY-MM-DD) or relative (+Nd, +Nw, +Nm, +Ny).
@@ -213,8 +296,7 @@ def parse_date_argument(date_str, reference_date=None):
         return reference_date
     
     # Handle relative dates: +Nd, +Nw, +Nm, +Ny (or just +N for days)
-    relative_pattern = r'^\+(\d+)([dwmy])?$'
-    match = re.match(relative_pattern, date_str)
+    match = _REL_RE.match(date_str)
     
     if match:
         amount = int(match.group(1))
@@ -225,9 +307,9 @@ def parse_date_argument(date_str, reference_date=None):
         elif unit == 'w':
             return reference_date + timedelta(weeks=amount)
         elif unit == 'm':
-            return reference_date + relativedelta(months=amount)
+            return add_months(reference_date, amount)
         elif unit == 'y':
-            return reference_date + relativedelta(years=amount)
+            return add_years(reference_date, amount)
     
     # Try parsing as absolute date (YYYY-MM-DD)
     try:
@@ -241,6 +323,26 @@ def parse_date_argument(date_str, reference_date=None):
 
 
 
+@lru_cache(maxsize=32)
+def _load_yaml_cached(config_path, mtime_ns):
+    """
+    Parse a YAML file, cached by (path, modification time).
+    
+    The mtime is part of the cache key so an edited file is re-parsed.
+    The returned object is shared between callers and must not be mutated.
+    """
+    import yaml
+    
+    # Prefer the libyaml-backed loader when PyYAML was built with it
+    try:
+        from yaml import CSafeLoader as Loader
+    except ImportError:
+        from yaml import SafeLoader as Loader
+    
+    with open(config_path, 'rb') as f:
+        return yaml.load(f, Loader=Loader)
+
+
 def load_schedule_config(config_file):
     """
     Load schedule configuration from YAML file.
@@ -254,8 +356,8 @@ def load_schedule_config(config_file):
     if not os.path.exists(config_file):
         raise FileNotFoundError(f"Configuration file not found: {config_file}")
     
-    with open(config_file, 'r') as f:
-        config = yaml.safe_load(f)
+    config_path = os.path.abspath(config_file)
+    config = _load_yaml_cached(config_path, os.stat(config_path).st_mtime_ns)
     
     if 'schedule' not in config:
         raise ValueError(f"Invalid configuration file: missing 'schedule' key")
@@ -290,50 +392,76 @@ def calculate_date_range(schedule_config, start_date_override=None, end_date_ove
     else:
         # Use config duration or default 3 months
         duration_months = schedule_config.get('duration_months', 3)
-        end_date = start_date + relativedelta(months=duration_months)
+        end_date = add_months(start_date, duration_months)
     
     return start_date, end_date
 
 
-def generate_dates_for_layer(layer_config, start_date, end_date):
+def get_layer_time_windows(layer_config):
     """
-    Generate all dates where a layer should have shifts.
-    Now supports time_windows per day configuration.
+    Resolve a layer's time window for each day of the week.
     
     Args:
         layer_config: Layer configuration dictionary
-        start_date: Start date (datetime)
-        end_date: End date (datetime)
     
     Returns:
-        List of tuples (datetime, day_name) for dates where this layer is active
+        List of 7 entries indexed by weekday (Monday=0). Each entry is a
+        (start, end, is_dummy) tuple, or None when the layer is off that day.
     """
-    day_map = {
-        'monday': 0, 'tuesday': 1, 'wednesday': 2, 
-        'thursday': 3, 'friday': 4, 'saturday': 5, 'sunday': 6
-    }
+    windows = [None] * 7
     
     # New structure: time_windows with per-day configuration
     if 'time_windows' in layer_config:
         time_windows = layer_config.get('time_windows', {})
-        active_weekdays = {day_map[day.lower()]: day.lower() 
-                          for day in time_windows.keys() if day.lower() in day_map}
+        for day, day_window in time_windows.items():
+            weekday = _DAY_MAP.get(day.lower())
+            if weekday is not None:
+                windows[weekday] = (
+                    day_window.get('start', 'N/A'),
+                    day_window.get('end', 'N/A'),
+                    day_window.get('dummy', False)  # Check if specific day is dummy
+                )
     else:
         # Fallback to old structure for backward compatibility
-        active_days = layer_config.get('days', [])
-        active_weekdays = {day_map[day.lower()]: day.lower() 
-                          for day in active_days if day.lower() in day_map}
+        old_time_window = layer_config.get('time_window', {})
+        for day in layer_config.get('days', []):
+            weekday = _DAY_MAP.get(day.lower())
+            if weekday is not None:
+                windows[weekday] = (
+                    old_time_window.get('start', 'N/A'),
+                    old_time_window.get('end', 'N/A'),
+                    False
+                )
+    
+    return windows
+
+
+def generate_dates_for_layer(layer_windows, start_date, end_date):
+    """
+    Generate all dates where a layer should have shifts.
+    Now supports time_windows per day configuration.
     
-    dates = []
-    current_date = start_date
+    Args:
+        layer_windows: Per-weekday time windows from get_layer_time_windows()
+        start_date: Start date (datetime)
+        end_date: End date (datetime)
     
-    while current_date < end_date:
-        weekday = current_date.weekday()
-        if weekday in active_weekdays:
-            dates.append((current_date, active_weekdays[weekday]))
-        current_date += timedelta(days=1)
+    Returns:
+        List of tuples (datetime, weekday) for dates where this layer is active
+    """
+    import numpy as np
+    
+    # Vectorized weekday mask over the day offsets of the whole range
+    mask = np.array([window is not None for window in layer_windows])
     
-    return dates
+    start_weekday = start_date.weekday()
+    num_days = max(0, -((start_date - end_date) // timedelta(days=1)))  # ceil, like the old day loop
+    offsets = np.arange(num_days)
+    hits = offsets[mask[(start_weekday + offsets) % 7]]
+    
+    # Materialize datetimes only for the active days
+    return [(start_date + timedelta(days=int(offset)), (start_weekday + int(offset)) % 7)
+            for offset in hits]
 
 
 def generate_oncall_calendar(config_file, output_file, start_date_override=None, end_date_override=None):
@@ -347,6 +475,11 @@ def generate_oncall_calendar(config_file, output_file, start_date_override=None,
         start_date_override: Optional start date override (datetime)
         end_date_override: Optional end date override (datetime)
     """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+    from openpyxl.worksheet.cell_range import CellRange
+    
     # Load configuration
     schedule_config = load_schedule_config(config_file)
     schedule_name = schedule_config.get('name', 'On-Call Schedule')
@@ -360,10 +493,9 @@ def generate_oncall_calendar(config_file, output_file, start_date_override=None,
     if not layers_config:
         raise ValueError("No layers defined in configuration file")
     
-    # Create workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "On-Call Schedule"
+    # Create workbook (write-only mode streams rows straight to XML)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("On-Call Schedule")
     
     # Define styles
     header_fill = PatternFill(start_color="1F4788", end_color="1F4788", fill_type="solid")
@@ -385,94 +517,86 @@ def generate_oncall_calendar(config_file, output_file, start_date_override=None,
         "C8E6C9", "BBDEFB", "FFE0B2", "F8BBD0", "E1BEE7"
     ]
     
-    # Write header
-    row = 1
-    ws.merge_cells(f'A{row}:G{row}')
-    cell = ws[f'A{row}']
-    cell.value = schedule_name
-    cell.fill = header_fill
-    cell.font = Font(bold=True, color="FFFFFF", size=14)
-    cell.alignment = center_align
-    
-    row += 1
-    ws.merge_cells(f'A{row}:G{row}')
-    cell = ws[f'A{row}']
-    cell.value = schedule_description
-    cell.alignment = center_align
-    cell.font = Font(italic=True)
+    # Build a styled cell for streaming into the write-only sheet
+    def make_cell(value, fill=None, font=None, border=None, alignment=None):
+        cell = WriteOnlyCell(ws, value=value)
+        if fill is not None:
+            cell.fill = fill
+        if font is not None:
+            cell.font = font
+        if border is not None:
+            cell.border = border
+        if alignment is not None:
+            cell.alignment = alignment
+        return cell
     
-    row += 1
-    ws.merge_cells(f'A{row}:G{row}')
-    cell = ws[f'A{row}']
-    cell.value = f"Period: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
-    cell.alignment = center_align
-    cell.font = Font(bold=True)
+    # Adjust column widths (must be set before any row is written)
+    ws.column_dimensions['A'].width = 15
+    ws.column_dimensions['B'].width = 12
+    ws.column_dimensions['C'].width = 12
+    ws.column_dimensions['D'].width = 12
+    ws.column_dimensions['E'].width = 8
+    ws.column_dimensions['F'].width = 20
+    ws.column_dimensions['G'].width = 15
     
-    row += 1
-    ws.merge_cells(f'A{row}:G{row}')
-    cell = ws[f'A{row}']
-    cell.value = f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-    cell.alignment = center_align
-    cell.font = Font(size=9, italic=True)
+    # Write header
+    title_rows = [
+        make_cell(schedule_name, fill=header_fill, font=Font(bold=True, color="FFFFFF", size=14),
+                  alignment=center_align),
+        make_cell(schedule_description, font=Font(italic=True), alignment=center_align),
+        make_cell(f"Period: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}",
+                  font=Font(bold=True), alignment=center_align),
+        make_cell(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+                  font=Font(size=9, italic=True), alignment=center_align),
+    ]
     
-    row += 2
+    # Lazily yield a layer's visible shifts in date order, rotating through its team
+    def iter_layer_shifts(layer_idx, layer_name, rotation_team, dates, windows):
+        # Every active date takes the next person, so dummy days still consume the rotation
+        for (shift_date, weekday), person in zip(dates, cycle(rotation_team)):
+            window = windows[weekday]
+            if window is not None:
+                yield Shift(shift_date, layer_name, *window, person, layer_idx)
     
-    # Process each layer
-    layer_shifts = []  # List of (date, layer_name, time_window, person, layer_id)
+    # Prepare each layer; time windows are parsed here so bad values fail before any row is written
+    layer_streams = []
     
     for layer_idx, (layer_id, layer_config) in enumerate(layers_config.items()):
         layer_name = layer_config.get('name', layer_id)
         rotation_team = layer_config.get('rotation_team', [])
         is_dummy_layer = layer_config.get('dummy', False)  # Check if entire layer is dummy
         
-        if not rotation_team:
+        # Dummy layers never appear in the output
+        if not rotation_team or is_dummy_layer:
             continue
         
-        # Check if using new time_windows structure or old time_window
-        time_windows = layer_config.get('time_windows', {})
-        old_time_window = layer_config.get('time_window', {})
-        
         # Generate dates for this layer
-        dates = generate_dates_for_layer(layer_config, start_date, end_date)
+        layer_windows = get_layer_time_windows(layer_config)
+        dates = generate_dates_for_layer(layer_windows, start_date, end_date)
         
-        # Assign people in rotation
-        for date_idx, (shift_date, day_name) in enumerate(dates):
-            person = rotation_team[date_idx % len(rotation_team)]
-            
-            # Get time window for this specific day
-            is_dummy_day = False
-            if time_windows and day_name in time_windows:
-                day_window = time_windows[day_name]
-                start_time = day_window.get('start', 'N/A')
-                end_time = day_window.get('end', 'N/A')
-                is_dummy_day = day_window.get('dummy', False)  # Check if specific day is dummy
-            else:
-                # Fallback to old structure
-                start_time = old_time_window.get('start', 'N/A')
-                end_time = old_time_window.get('end', 'N/A')
-            
-            # Skip adding dummy shifts to the output (either layer-level or day-level dummy)
-            if not is_dummy_layer and not is_dummy_day:
-                layer_shifts.append((
-                    shift_date,
-                    layer_name,
-                    f"{start_time} - {end_time}",
-                    person,
-                    layer_idx
-                ))
-    
-    # Sort shifts by date and then by start time
-    layer_shifts.sort(key=lambda x: (x[0], x[2]))
+        # Parse the windows of the weekdays in range: (start_h, start_m, end_h, end_m), or None for dummy days
+        windows = [None] * 7
+        for weekday in {weekday for _, weekday in dates}:
+            start_time, end_time, is_dummy_day = layer_windows[weekday]
+            if not is_dummy_day:
+                windows[weekday] = _parse_time(start_time) + _parse_time(end_time)
+        
+        layer_streams.append(iter_layer_shifts(layer_idx, layer_name, rotation_team, dates, windows))
+    
+    # Stream the title rows only once every shift has been validated
+    row = 1
+    for title_cell in title_rows:
+        ws.append([title_cell])
+        ws.merged_cells.add(CellRange(min_col=1, min_row=row, max_col=7, max_row=row))
+        row += 1
+    
+    ws.append([])
+    row += 1
     
     # Write column headers (removed Layer column, added Start Time, End Time, Hours, On-Call Status)
     headers = ['Date', 'Day', 'Start Time', 'End Time', 'Hours', 'On-Call Person', 'On-Call Status']
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws.cell(row=row, column=col_idx)
-        cell.value = header
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.border = border
-        cell.alignment = center_align
+    ws.append([make_cell(header, fill=header_fill, font=header_font, border=border, alignment=center_align)
+               for header in headers])
     
     row += 1
     start_data_row = row
@@ -481,68 +605,63 @@ def generate_oncall_calendar(config_file, output_file, start_date_override=None,
     person_colors = {}
     color_idx = 0
     
+    # One shared fill per color, reused by every cell of that person
+    fill_cache = {}
+    
+    def get_fill(color):
+        fill = fill_cache.get(color)
+        if fill is None:
+            fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+            fill_cache[color] = fill
+        return fill
+    
+    # Merge the layer streams by date and write each day's shifts, sorted by time, as they are produced
+    layer_shifts = []  # List of Shift tuples, kept for overrides, the chart and ICS export
+    by_date = attrgetter('date')
+    by_time = attrgetter('start_h', 'start_m', 'end_h', 'end_m')
+    
+    day_shifts_iter = (sorted(day_shifts, key=by_time)
+                       for _, day_shifts in groupby(heapq.merge(*layer_streams, key=by_date), key=by_date))
+    
     # Write data rows
-    current_date = None
-    for shift_date, layer_name, time_window, person, layer_idx in layer_shifts:
+    for shift in chain.from_iterable(day_shifts_iter):
+        shift_date = shift.date
+        person = shift.person
+        
         # Add empty row between different dates
-        if current_date and current_date != shift_date:
-            row += 1  # Empty row separator
+        if layer_shifts and layer_shifts[-1].date != shift_date:
+            ws.append([None] * 7)  # Empty row separator
+            row += 1
         
-        current_date = shift_date
+        layer_shifts.append(shift)
         
         # Assign color to person if not yet assigned
         if person not in person_colors:
             person_colors[person] = colors[color_idx % len(colors)]
             color_idx += 1
         
-        color = person_colors[person]
-        
-        # Parse time window to get start and end times
-        time_parts = time_window.split(' - ')
-        start_time = time_parts[0] if len(time_parts) > 0 else 'N/A'
-        end_time = time_parts[1] if len(time_parts) > 1 else 'N/A'
+        fill = get_fill(person_colors[person])
         
-        # Write row data (removed Layer column)
-        ws.cell(row=int(row), column=1).value = shift_date  # Date as datetime for formula
-        ws.cell(row=int(row), column=2).value = shift_date.strftime('%A')
-        ws.cell(row=int(row), column=3).value = start_time
-        ws.cell(row=int(row), column=4).value = end_time
+        # Hours formula (D-C converted to hours)
+        hours_formula = f'=(D{row}-C{row})*24'
         
-        # Add Hours formula in column 5 (D-C converted to hours)
-        row_num = int(row)
-        hours_formula = f'=(D{row_num}-C{row_num})*24'
-        ws.cell(row=row_num, column=5).value = hours_formula
-        
-        ws.cell(row=int(row), column=6).value = person
-        
-        # Add On-Call Status formula in column 7
+        # On-Call Status formula
         # Formula checks if NOW() is between Date+StartTime and Date+EndTime
-        oncall_formula = f'=IF(AND(NOW()>=A{row_num}+C{row_num},NOW()<=A{row_num}+D{row_num}),"On-Call","")'
-        ws.cell(row=row_num, column=7).value = oncall_formula
+        oncall_formula = f'=IF(AND(NOW()>=A{row}+C{row},NOW()<=A{row}+D{row}),"On-Call","")'
         
-        # Apply styling
-        for col in range(1, 8):
-            cell = ws.cell(row=int(row), column=col)
-            cell.border = border
-            cell.alignment = center_align
-            cell.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        # Write row data (removed Layer column); date is kept as datetime for formula
+        values = [shift_date, _weekday_name(shift_date.toordinal()), shift.start_time, shift.end_time,
+                  hours_formula, person, oncall_formula]
+        row_cells = [make_cell(value, fill=fill, border=border, alignment=center_align) for value in values]
         
         # Format date column as date
-        ws.cell(row=int(row), column=1).number_format = 'YYYY-MM-DD'
+        row_cells[0].number_format = 'YYYY-MM-DD'
         # Format hours column with 1 decimal place
-        ws.cell(row=int(row), column=5).number_format = '0.0'
+        row_cells[4].number_format = '0.0'
         
+        ws.append(row_cells)
         row += 1
     
-    # Adjust column widths
-    ws.column_dimensions['A'].width = 15
-    ws.column_dimensions['B'].width = 12
-    ws.column_dimensions['C'].width = 12
-    ws.column_dimensions['D'].width = 12
-    ws.column_dimensions['E'].width = 8
-    ws.column_dimensions['F'].width = 20
-    ws.column_dimensions['G'].width = 15
-    
     # Save workbook
     wb.save(output_file)
     
@@ -567,19 +686,24 @@ def generate_visual_schedule(layer_shifts, person_colors, start_date, end_date,
     Generate a visual representation of the on-call schedule.
     
     Args:
-        layer_shifts: List of (date, layer_name, time_window, person, layer_idx)
+        layer_shifts: List of Shift tuples
         person_colors: Dictionary mapping person names to color codes
         start_date: Start date
         end_date: End date
         schedule_name: Schedule name
         output_file: Output image filename
     """
+    import numpy as np
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as mpatches
+    from matplotlib.collections import PolyCollection
+    
     # Show all days - remove limit
     days_to_show = (end_date - start_date).days
     viz_end_date = end_date
     
     # Filter shifts for visualization period
-    viz_shifts = [(d, ln, tw, p, li) for d, ln, tw, p, li in layer_shifts if d < viz_end_date]
+    viz_shifts = [shift for shift in layer_shifts if shift.date < viz_end_date]
     
     if not viz_shifts:
         print("  ! No shifts to visualize")
@@ -587,19 +711,18 @@ def generate_visual_schedule(layer_shifts, person_colors, start_date, end_date,
     
     # Group shifts by date
     shifts_by_date = {}
-    for shift_date, layer_name, time_window, person, layer_idx in viz_shifts:
-        date_key = shift_date.strftime('%Y-%m-%d')
+    for shift in viz_shifts:
+        date_key = _iso(shift.date.toordinal())
         if date_key not in shifts_by_date:
             shifts_by_date[date_key] = []
         
-        # Parse time window
-        start_time, end_time = time_window.split(' - ')
+        # Time to y-coordinate mapping (hours as a float)
         shifts_by_date[date_key].append({
-            'layer': layer_name,
-            'start': start_time,
-            'end': end_time,
-            'person': person,
-            'date': shift_date
+            'layer': shift.layer_name,
+            'start': shift.start_h + shift.start_m / 60.0,
+            'end': shift.end_h + shift.end_m / 60.0,
+            'person': shift.person,
+            'date': shift.date
         })
     
     # Create figure
@@ -613,30 +736,31 @@ def generate_visual_schedule(layer_shifts, person_colors, start_date, end_date,
     
     fig, ax = plt.subplots(figsize=(fig_width, fig_height))
     
-    # Convert hex colors to RGB
-    def hex_to_rgb(hex_color):
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) / 255.0 for i in (0, 2, 4))
-    
-    # Time to y-coordinate mapping
-    def time_to_y(time_str):
-        hours, minutes = map(int, time_str.split(':'))
-        return hours + minutes / 60.0
+    # Convert each person's hex color to RGB once
+    person_rgb = {person: _hex_to_rgb(color_hex) for person, color_hex in person_colors.items()}
+    default_rgb = _hex_to_rgb('CCCCCC')
     
     # Find global min and max times across all shifts for dynamic Y-axis
     all_times = []
     for date_str in dates:
         for shift in shifts_by_date[date_str]:
-            all_times.append(time_to_y(shift['start']))
-            all_times.append(time_to_y(shift['end']))
+            all_times.append(shift['start'])
+            all_times.append(shift['end'])
     
     min_time = int(min(all_times))
     max_time = int(max(all_times)) + 1
     
     # Plot shifts
     bar_width = 0.8
+    min_label_height = 0.25  # Bars shorter than this (in hours) are too small to hold a name
     x_pos = 0
     
+    # Bar geometry and colors, drawn afterwards as a single collection
+    bar_x = []
+    bar_y_start = []
+    bar_y_end = []
+    bar_colors = []
+    
     date_positions = {}
     for date_str in dates:
         shifts = shifts_by_date[date_str]
@@ -646,23 +770,22 @@ def generate_visual_schedule(layer_shifts, person_colors, start_date, end_date,
         date_positions[date_str] = x_pos
         
         for shift in shifts:
-            y_start = time_to_y(shift['start'])
-            y_end = time_to_y(shift['end'])
+            y_start = shift['start']
+            y_end = shift['end']
             height = y_end - y_start
             
             person = shift['person']
-            color_hex = person_colors.get(person, 'CCCCCC')
-            color_rgb = hex_to_rgb(color_hex)
             
-            # Draw rectangle for shift
-            rect = Rectangle((x_pos - bar_width/2, y_start), bar_width, height,
-                           facecolor=color_rgb, edgecolor='black', linewidth=1)
-            ax.add_patch(rect)
+            bar_x.append(x_pos)
+            bar_y_start.append(y_start)
+            bar_y_end.append(y_end)
+            bar_colors.append(person_rgb.get(person, default_rgb))
             
             # Add person name in the middle of the bar (horizontal text)
-            text_y = y_start + height / 2
-            ax.text(x_pos, text_y, person, ha='center', va='center',
-                   fontsize=7, fontweight='bold', rotation=0)
+            if height >= min_label_height:
+                text_y = y_start + height / 2
+                ax.text(x_pos, text_y, person, ha='center', va='center',
+                       fontsize=7, fontweight='bold', rotation=0)
         
         # Add date label above (position above the chart area) - horizontal text
         ax.text(x_pos, min_time - 1.5, f"{date_str}\n{day_name}", ha='center', va='top',
@@ -670,6 +793,19 @@ def generate_visual_schedule(layer_shifts, person_colors, start_date, end_date,
         
         x_pos += 1
     
+    # Draw all shift rectangles at once: corners (left, top), (left, bottom), (right, bottom), (right, top)
+    left = np.asarray(bar_x, dtype=float) - bar_width / 2
+    right = left + bar_width
+    y_start = np.asarray(bar_y_start, dtype=float)
+    y_end = np.asarray(bar_y_end, dtype=float)
+    verts = np.stack([
+        np.column_stack((left, y_start)),
+        np.column_stack((left, y_end)),
+        np.column_stack((right, y_end)),
+        np.column_stack((right, y_start)),
+    ], axis=1)
+    ax.add_collection(PolyCollection(verts, facecolors=bar_colors, edgecolors='black', linewidths=1))
+    
     # Configure axes
     ax.set_xlim(-0.5, num_dates - 0.5)
     ax.set_ylim(min_time - 2, max_time)  # Increased space from -1 to -2 for dates
@@ -694,9 +830,7 @@ def generate_visual_schedule(layer_shifts, person_colors, start_date, end_date,
     # Legend for people
     legend_elements = []
     for person in sorted(person_colors.keys()):
-        color_hex = person_colors[person]
-        color_rgb = hex_to_rgb(color_hex)
-        legend_elements.append(mpatches.Patch(facecolor=color_rgb, edgecolor='black', label=person))
+        legend_elements.append(mpatches.Patch(facecolor=person_rgb[person], edgecolor='black', label=person))
     
     ax.legend(handles=legend_elements, loc='upper right', bbox_to_anchor=(1.12, 1),
              title='Team Members', fontsize=9)
@@ -714,7 +848,7 @@ def generate_ics_files(layer_shifts, schedule_name, output_dir="."):
     Generate ICS (iCalendar) files for each person in the schedule.
     
     Args:
-        layer_shifts: List of (date, layer_name, time_window, person, layer_idx)
+        layer_shifts: List of Shift tuples
         schedule_name: Schedule name
         output_dir: Directory to save ICS files
     """
@@ -722,86 +856,83 @@ def generate_ics_files(layer_shifts, schedule_name, output_dir="."):
     
     # Group shifts by person
     shifts_by_person = defaultdict(list)
-    for shift_date, layer_name, time_window, person, layer_idx in layer_shifts:
-        shifts_by_person[person].append((shift_date, layer_name, time_window))
+    for shift in layer_shifts:
+        shifts_by_person[shift.person].append(shift)
     
     # Create output directory if it doesn't exist
     ics_dir = os.path.join(output_dir, "ics_files")
     os.makedirs(ics_dir, exist_ok=True)
     
-    # Generate ICS file for each person
-    for person, shifts in shifts_by_person.items():
-        # Sanitize filename and pad numbers with zero (e.g., Utente 1 -> Utente 01)
-        import re
+    # Single generation timestamp shared by every event's DTSTAMP
+    now_str = datetime.now().strftime('%Y%m%dT%H%M%SZ')
+    
+    # Sanitize filenames and pad numbers with zero (e.g., Utente 1 -> Utente 01)
+    safe_filenames = {}
+    for person in shifts_by_person:
         safe_filename = "".join(c if c.isalnum() or c in (' ', '_', '-') else '_' for c in person)
         # Replace single digit numbers with zero-padded version
-        safe_filename = re.sub(r'\b(\d)\b', r'0\1', safe_filename)
-        ics_file = os.path.join(ics_dir, f"{safe_filename}.ics")
+        safe_filenames[person] = _DIGIT_RE.sub(r'0\1', safe_filename)
+    
+    # Generate ICS file for each person
+    for person, shifts in shifts_by_person.items():
+        ics_file = os.path.join(ics_dir, f"{safe_filenames[person]}.ics")
         
-        with open(ics_file, 'w', encoding='utf-8') as f:
-            # Write ICS header
-            f.write("BEGIN:VCALENDAR\n")
-            f.write("VERSION:2.0\n")
-            f.write("PRODID:-//On-Call Scheduler//EN\n")
-            f.write(f"X-WR-CALNAME:{person} - On-Call Schedule\n")
-            f.write("X-WR-TIMEZONE:UTC\n")
-            f.write("CALSCALE:GREGORIAN\n")
-            f.write("METHOD:PUBLISH\n")
+        # ICS header; the whole file is assembled in memory and written once
+        parts = [
+            "BEGIN:VCALENDAR\n"
+            "VERSION:2.0\n"
+            "PRODID:-//On-Call Scheduler//EN\n"
+            f"X-WR-CALNAME:{person} - On-Call Schedule\n"
+            "X-WR-TIMEZONE:UTC\n"
+            "CALSCALE:GREGORIAN\n"
+            "METHOD:PUBLISH\n"
+        ]
+        
+        # Write each shift as an event
+        for shift in shifts:
+            layer_name = shift.layer_name
             
-            # Write each shift as an event
-            for shift_date, layer_name, time_window in shifts:
-                # Parse time window
-                time_parts = time_window.split(' - ')
-                start_time_str = time_parts[0] if len(time_parts) > 0 else '00:00'
-                end_time_str = time_parts[1] if len(time_parts) > 1 else '23:59'
-                
-                # Parse times
-                start_hour, start_min = map(int, start_time_str.split(':'))
-                end_hour, end_min = map(int, end_time_str.split(':'))
-                
-                # Create datetime objects
-                start_dt = shift_date.replace(hour=start_hour, minute=start_min, second=0, microsecond=0)
-                end_dt = shift_date.replace(hour=end_hour, minute=end_min, second=0, microsecond=0)
-                
-                # Format for ICS (YYYYMMDDTHHMMSS)
-                start_str = start_dt.strftime('%Y%m%dT%H%M%S')
-                end_str = end_dt.strftime('%Y%m%dT%H%M%S')
-                
-                # Generate unique UID
-                uid = f"{start_str}-{person.replace(' ', '-')}-oncall@scheduler"
-                
-                # Current timestamp for DTSTAMP
-                now_str = datetime.now().strftime('%Y%m%dT%H%M%SZ')
-                
-                # Write event
-                f.write("BEGIN:VEVENT\n")
-                f.write(f"UID:{uid}\n")
-                f.write(f"DTSTAMP:{now_str}\n")
-                f.write(f"DTSTART:{start_str}\n")
-                f.write(f"DTEND:{end_str}\n")
-                f.write(f"SUMMARY:On-Call: {layer_name}\n")
-                f.write(f"DESCRIPTION:On-call shift for {person}\\nLayer: {layer_name}\\nSchedule: {schedule_name}\n")
-                f.write(f"LOCATION:On-Call\n")
-                f.write("STATUS:CONFIRMED\n")
-                f.write("TRANSP:OPAQUE\n")
-                f.write("BEGIN:VALARM\n")
-                f.write("TRIGGER:-PT15M\n")
-                f.write("ACTION:DISPLAY\n")
-                f.write("DESCRIPTION:On-Call shift starts in 15 minutes\n")
-                f.write("END:VALARM\n")
-                f.write("END:VEVENT\n")
+            # Create datetime objects
+            start_dt = shift.date.replace(hour=shift.start_h, minute=shift.start_m, second=0, microsecond=0)
+            end_dt = shift.date.replace(hour=shift.end_h, minute=shift.end_m, second=0, microsecond=0)
+            
+            # Format for ICS (YYYYMMDDTHHMMSS)
+            start_str = start_dt.strftime('%Y%m%dT%H%M%S')
+            end_str = end_dt.strftime('%Y%m%dT%H%M%S')
             
-            # Write ICS footer
-            f.write("END:VCALENDAR\n")
+            # Generate unique UID
+            uid = f"{start_str}-{person.replace(' ', '-')}-oncall@scheduler"
+            
+            # Event block
+            parts.append(
+                "BEGIN:VEVENT\n"
+                f"UID:{uid}\n"
+                f"DTSTAMP:{now_str}\n"
+                f"DTSTART:{start_str}\n"
+                f"DTEND:{end_str}\n"
+                f"SUMMARY:On-Call: {layer_name}\n"
+                f"DESCRIPTION:On-call shift for {person}\\nLayer: {layer_name}\\nSchedule: {schedule_name}\n"
+                "LOCATION:On-Call\n"
+                "STATUS:CONFIRMED\n"
+                "TRANSP:OPAQUE\n"
+                "BEGIN:VALARM\n"
+                "TRIGGER:-PT15M\n"
+                "ACTION:DISPLAY\n"
+                "DESCRIPTION:On-Call shift starts in 15 minutes\n"
+                "END:VALARM\n"
+                "END:VEVENT\n"
+            )
+        
+        # ICS footer
+        parts.append("END:VCALENDAR\n")
+        
+        with open(ics_file, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            f.write(''.join(parts))
     
     print(f"✓ ICS files generated in: {ics_dir}/")
     print(f"  - Generated {len(shifts_by_person)} calendar files")
     for person in sorted(shifts_by_person.keys()):
-        import re
-        safe_filename = "".join(c if c.isalnum() or c in (' ', '_', '-') else '_' for c in person)
-        # Replace single digit numbers with zero-padded version
-        safe_filename = re.sub(r'\b(\d)\b', r'0\1', safe_filename)
-        print(f"    • {safe_filename}.ics ({len(shifts_by_person[person])} shifts)")
+        print(f"    • {safe_filenames[person]}.ics ({len(shifts_by_person[person])} shifts)")
 
 
 
@@ -849,6 +980,12 @@ Examples:
         help='Generate ICS (iCalendar) files for each team member'
     )
     
+    parser.add_argument(
+        '--no-visual',
+        action='store_true',
+        help='Skip generating the PNG visual schedule'
+    )
+    
     parser.add_argument(
         '--override',
         action='append',
@@ -929,10 +1066,11 @@ Examples:
             save_execution_metadata(output_dir, args.config, start_date_actual, end_date_actual, 
                                   args.overrides or [], applied_overrides)
             
-            # Generate visual representation
-            visual_output = output_file.replace('.xlsx', '.png')
-            generate_visual_schedule(layer_shifts, person_colors, start_date_actual, 
-                                   end_date_actual, schedule_name, visual_output)
+            # Generate visual representation unless disabled
+            if not args.no_visual:
+                visual_output = output_file.replace('.xlsx', '.png')
+                generate_visual_schedule(layer_shifts, person_colors, start_date_actual, 
+                                       end_date_actual, schedule_name, visual_output)
             
             # Generate ICS files if requested
             if args.generate_ics: